@@ -3,6 +3,7 @@ import configparser
 
 class TTConfig:
     config: configparser.ConfigParser = configparser.ConfigParser()
+    path: str = None
     use_prod: bool = False
     use_mfa: bool = False
     username: str = None
@@ -13,7 +14,8 @@ class TTConfig:
     prod_wss: str = None
 
     def __init__(self, path: str = "./utils", filename: str = "tt.config") -> None:
-        self.config.read(f"{path}/{filename}")
+        self.path = f"{path}/{filename}"
+        self.config.read(self.path)
         self.use_prod = self.config.get("Config", "use_prod") in (
             "True",
             "true",
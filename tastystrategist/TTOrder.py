@@ -1,6 +1,10 @@
 import json
+from datetime import datetime
+from decimal import Decimal
 from enum import Enum
-from tastytrade.instruments import Option
+from tastytrade.instruments import OptionType
+
+from tastystrategist.symbols import occ_symbol, streamer_symbol
 
 class TTOrderType(Enum):
   LIMIT = 'Limit'
@@ -47,11 +51,12 @@ class TTOption:
 
   def __init__(self, symbol: str = None, date: str = None,
                 side: TTOptionSide = None, strike: float = None) -> None:
-    symbol = symbol.ljust(6, ' ')
-    strike_str = str(int(strike * 100)).replace('.', '').zfill(6)
-    self.symbol = symbol + date + side.value + '0' + strike_str + '0'
+    expiry = datetime.strptime(date, '%y%m%d').date()
+    option_type = OptionType(side.value)
+    strike = Decimal(str(strike))
+    self.symbol = occ_symbol(symbol, expiry, option_type, strike)
     self.strike_price = int(round(strike)) # integer strike
-    self.streamer_symbol = Option.occ_to_streamer_symbol(self.symbol)
+    self.streamer_symbol = streamer_symbol(symbol, expiry, option_type, strike)
 
 class TTOrder:
     def __init__(self, tif: TTTimeInForce = None, price: float = None,
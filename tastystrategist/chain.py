@@ -0,0 +1,52 @@
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+
+from tastytrade.instruments import Option, OptionType
+
+
+@dataclass
+class ExpiryIndex:
+    expiration: date
+    # Both sorted by ascending strike, the strike lists mirror them for bisection
+    puts: list[Option]
+    calls: list[Option]
+    put_strikes: list[Decimal]
+    call_strikes: list[Decimal]
+
+    @classmethod
+    def from_options(cls, expiration: date, options: list[Option]):
+        puts = sorted((o for o in options if o.option_type == OptionType.PUT), key=lambda o: o.strike_price)
+        calls = sorted((o for o in options if o.option_type == OptionType.CALL), key=lambda o: o.strike_price)
+        return cls(
+            expiration,
+            puts,
+            calls,
+            [o.strike_price for o in puts],
+            [o.strike_price for o in calls],
+        )
+
+    # Puts in [reference - interval, reference], ordered from the money outwards
+    def puts_in_window(self, reference_price: Decimal, search_interval: int) -> list[Option]:
+        lo = bisect_left(self.put_strikes, reference_price - search_interval)
+        hi = bisect_right(self.put_strikes, reference_price)
+        return self.puts[lo:hi][::-1]
+
+    # Calls in [reference, reference + interval], ordered from the money outwards
+    def calls_in_window(self, reference_price: Decimal, search_interval: int) -> list[Option]:
+        lo = bisect_left(self.call_strikes, reference_price)
+        hi = bisect_right(self.call_strikes, reference_price + search_interval)
+        return self.calls[lo:hi]
+
+
+def select_expiries(
+    chain: dict[date, list[Option]],
+    expiry_count: int = 1,
+    min_days_to_expiry: int = 1,
+    today: date | None = None,
+) -> dict[date, ExpiryIndex]:
+    # Take the nearest listed expiries instead of a fixed calendar offset, so weekends and holidays are skipped
+    today = today or date.today()
+    expirations = sorted(e for e in chain if (e - today).days >= min_days_to_expiry)[:expiry_count]
+    return {e: ExpiryIndex.from_options(e, chain[e]) for e in expirations}
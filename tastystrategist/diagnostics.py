@@ -0,0 +1,134 @@
+import asyncio
+import os
+import signal
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+
+
+def _task_name(loop: asyncio.AbstractEventLoop) -> str:
+    # Read from a foreign thread, this is only a best effort snapshot
+    task = asyncio.current_task(loop)
+    if task is None:
+        return '<no task>'
+    return f'{task.get_name()} {task.get_coro().__qualname__}'
+
+
+@dataclass
+class LoopMonitor:
+    loop: asyncio.AbstractEventLoop
+    loop_thread_id: int
+    interval: float = 0.1
+    stall_threshold: float = 0.25
+    last_lag: float = 0.0
+    max_lag: float = 0.0
+    _heartbeat: float = field(default_factory=time.monotonic)
+    _stop: threading.Event = field(default_factory=threading.Event)
+    _task: asyncio.Task | None = None
+    _watchdog: threading.Thread | None = None
+
+    @classmethod
+    async def create(cls, interval: float = 0.1, stall_threshold: float = 0.25):
+        self = cls(asyncio.get_running_loop(), threading.get_ident(), interval, stall_threshold)
+        self._task = asyncio.create_task(self._measure_lag(), name='loop-monitor')
+        # The watchdog has to live outside the loop to see a stall while it is happening
+        self._watchdog = threading.Thread(target=self._watch, name='loop-watchdog', daemon=True)
+        self._watchdog.start()
+        return self
+
+    async def _measure_lag(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            self._heartbeat = time.monotonic()
+            self.last_lag = self._heartbeat - expected
+            # Stalls are reported by the watchdog, with their stack
+            self.max_lag = max(self.max_lag, self.last_lag)
+
+    def _watch(self):
+        reported = False
+        while not self._stop.wait(self.stall_threshold / 2):
+            stalled = time.monotonic() - self._heartbeat - self.interval
+            if stalled <= self.stall_threshold:
+                reported = False
+                continue
+            # Report each stall once, with whatever the loop thread is stuck in right now
+            if not reported:
+                frame = sys._current_frames().get(self.loop_thread_id)
+                stack = ''.join(traceback.format_stack(frame, limit=8)) if frame is not None else ''
+                print(f'Event loop stalled for {stalled * 1000:.0f}ms in task {_task_name(self.loop)}\n{stack}')
+                reported = True
+
+    async def close(self):
+        self._stop.set()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            print('Closed loop monitor')
+
+
+@dataclass
+class SamplingProfiler:
+    loop: asyncio.AbstractEventLoop
+    loop_thread_id: int
+    sample_interval: float = 0.005
+    output_dir: str = './profiles'
+    _thread: threading.Thread | None = None
+
+    @classmethod
+    async def create(cls, sample_interval: float = 0.005, output_dir: str = './profiles'):
+        return cls(asyncio.get_running_loop(), threading.get_ident(), sample_interval, output_dir)
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, duration: float = 30.0):
+        if self.is_running():
+            print('Profiler is already running')
+            return
+        self._thread = threading.Thread(target=self._sample, args=(duration,), name='sampling-profiler', daemon=True)
+        self._thread.start()
+        print(f'Profiling the event loop for {duration}s')
+
+    def _sample(self, duration: float):
+        stacks = Counter()
+        end = time.monotonic() + duration
+        while time.monotonic() < end:
+            frame = sys._current_frames().get(self.loop_thread_id)
+            if frame is not None:
+                stacks[self._fold(frame)] += 1
+            time.sleep(self.sample_interval)
+        self._write(stacks)
+
+    # Root first and ';' separated, as expected by flamegraph.pl and speedscope
+    def _fold(self, frame) -> str:
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f'{code.co_qualname} ({os.path.basename(code.co_filename)}:{frame.f_lineno})')
+            frame = frame.f_back
+        names.append(_task_name(self.loop))
+        return ';'.join(reversed(names))
+
+    def _write(self, stacks: Counter):
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f'profile-{datetime.now():%Y%m%d-%H%M%S}.folded')
+        with open(path, 'w') as f:
+            for stack, count in stacks.most_common():
+                f.write(f'{stack} {count}\n')
+        print(f'Wrote {sum(stacks.values())} samples to {path}')
+
+
+# Lets a running process be profiled with `kill -USR1 <pid>`
+def install_profiler_signal(profiler: SamplingProfiler, duration: float = 30.0, sig: int = getattr(signal, 'SIGUSR1', None)):
+    try:
+        profiler.loop.add_signal_handler(sig, profiler.start, duration)
+    except (NotImplementedError, TypeError, ValueError):
+        print('Signal triggered profiling is not supported on this platform')
+        return
+    print(f'Send signal {sig} to process {os.getpid()} to profile for {duration}s')
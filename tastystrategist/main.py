@@ -6,8 +6,14 @@ from tastytrade import Session, Account
 from tastystrategist import Strategist
 from tastystrategist import TTConfig
 from tastystrategist.position import PositionState
+from tastystrategist.parameters import StrategyParametersWatcher
+from tastystrategist.diagnostics import LoopMonitor, SamplingProfiler, install_profiler_signal
 
 async def main():
+    loop_monitor = await LoopMonitor.create()
+    profiler = await SamplingProfiler.create()
+    install_profiler_signal(profiler)
+
     config = TTConfig(filename='tt.config')
     config_sandbox = TTConfig(filename='tt.sandbox.config')
     session = Session(config.username, config.password, is_test=not config.use_prod)
@@ -15,7 +21,13 @@ async def main():
     account_sandbox = Account.get_accounts(session_sandbox)[0]
     print(f'Account number: {account_sandbox.account_number}')
 
-    strategist = await Strategist.create(session, session_sandbox, account_sandbox, 'SPX', 'SPXW')
+    # Strategy knobs live in the [Strategy] section and are applied live whenever the file is saved
+    parameters_watcher = StrategyParametersWatcher(config.path)
+    parameters = parameters_watcher.load()
+
+    strategist = await Strategist.create(session, session_sandbox, account_sandbox, 'SPX', 'SPXW', parameters)
+    parameters_watcher.subscribe(strategist.apply_parameters)
+    parameters_task = asyncio.create_task(parameters_watcher.watch())
 
     root = tk.Tk()
     root.title("Strategist Winnings")
@@ -47,10 +59,15 @@ async def main():
     async def toggle_order(strategist: Strategist):
         current_text = order_button.cget("text")
         if current_text == "Open Order":
-            await strategist.position_manager.open_position(strategist.session_sandbox, strategist.sandbox_account, dry_run=False)
+            try:
+                await strategist.open_position(dry_run=False)
+            except ValueError as e:
+                print(f'Pre-trade check failed: {e}')
+                return
             order_button.config(text="Close Order", bg="red")
-        else:
-            await strategist.position_manager.close_position(strategist.session_sandbox, strategist.sandbox_account, dry_run=False)
+        # A stop-loss or take-profit may have closed it already
+        elif strategist.position_manager.state == PositionState.OPEN and not strategist.closing:
+            await strategist.close_position(dry_run=False)
             order_button.config(text="Open Order", bg="green")
 
     # Change the button command to use asyncio.create_task
@@ -81,7 +98,7 @@ async def main():
                 text=f"Open Positions: {strategist.position_manager.account_updates.num_open_positions()}"
             )
             margin_label.config(
-                text=f"Margin required: {(f'${strategist.position_manager.margin_requirement_no_wait():.2f}') if strategist.position_manager.margin_requirement_no_wait() is not None else 'N/A'}"
+                text=f"Margin required: {(f'${strategist.local_margin_requirement():.2f}') if strategist.local_margin_requirement() is not None else 'N/A'}"
             )
         elif PositionState.OPEN <= strategist.position_manager.state and strategist.position_manager.state <= PositionState.CLOSING_REQUESTED:
             winnings_label.config(text=f"Estimated Earnings: ${strategist.estimated_buying_power_effect() if strategist.estimated_buying_power_effect() is not None else 'N/A'}")
@@ -108,6 +125,7 @@ async def main():
                 text=f"Open Positions: {strategist.position_manager.account_updates.num_open_positions()}"
             )
         elif strategist.position_manager.state == PositionState.CLOSED:
+            order_button.config(text="Open Order", bg="green")
             # None check should not be necessary
             winnings_label.config(text=f"Actual Earnings: ${strategist.buying_power_effect() if strategist.buying_power_effect() is not None else 'N/A'}")
             put_to_buy_label.config(
@@ -136,7 +154,9 @@ async def main():
     # Main UI "thread"
     await tkinter_update()
 
+    parameters_task.cancel()
     await strategist.live_prices.close_channel()
+    await loop_monitor.close()
     session.destroy()
 
 if __name__ == '__main__':
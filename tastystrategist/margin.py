@@ -0,0 +1,60 @@
+from dataclasses import dataclass
+from decimal import Decimal
+
+from tastytrade.dxfeed import Quote
+
+from tastystrategist.position import IronCondor
+
+MULTIPLIER = Decimal('100.0')
+
+
+@dataclass(frozen=True)
+class IronCondorRisk:
+    put_width: Decimal
+    call_width: Decimal
+    # Per share, as quoted
+    credit: Decimal
+    quantity: Decimal = Decimal(1)
+
+    # Only one side can finish in the money, so the wider wing defines the risk
+    @property
+    def width(self) -> Decimal:
+        return max(self.put_width, self.call_width)
+
+    @property
+    def max_profit(self) -> Decimal:
+        return self.credit * MULTIPLIER * self.quantity
+
+    @property
+    def max_loss(self) -> Decimal:
+        return (self.width - self.credit) * MULTIPLIER * self.quantity
+
+    # Defined risk: the broker holds exactly the max loss
+    @property
+    def buying_power(self) -> Decimal:
+        return self.max_loss
+
+    @property
+    def return_on_risk(self) -> Decimal | None:
+        if self.max_loss <= 0:
+            return None
+        return self.max_profit / self.max_loss
+
+
+# Credit for opening at the natural price: sell at the bid, buy at the ask
+def iron_condor_credit(condor: IronCondor, quotes: dict[str, Quote]) -> Decimal:
+    return (
+        - quotes[condor.insurance_put.streamer_symbol].ask_price
+        + quotes[condor.main_put.streamer_symbol].bid_price
+        + quotes[condor.main_call.streamer_symbol].bid_price
+        - quotes[condor.insurance_call.streamer_symbol].ask_price
+    )
+
+
+def iron_condor_risk(condor: IronCondor, credit: Decimal, quantity: Decimal = Decimal(1)) -> IronCondorRisk:
+    return IronCondorRisk(
+        condor.main_put.strike_price - condor.insurance_put.strike_price,
+        condor.insurance_call.strike_price - condor.main_call.strike_price,
+        credit,
+        quantity,
+    )
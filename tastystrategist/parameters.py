@@ -0,0 +1,110 @@
+import asyncio
+import configparser
+import os
+from dataclasses import dataclass, field, fields
+from decimal import Decimal
+from typing import Awaitable, Callable
+
+
+def _optional_decimal(value: str) -> Decimal | None:
+    if value.strip().lower() in ('', 'none'):
+        return None
+    return Decimal(value)
+
+
+@dataclass(frozen=True)
+class StrategyParameters:
+    search_interval: int = 500
+    price_threshold: float = 3.5
+    insurance_offset: int = 30
+    build_interval: float = 3.0
+    reconcile_interval: float = 30.0
+    expiry_count: int = 1
+    min_days_to_expiry: int = 1
+    max_symbols: int = 400
+    max_quote_age: float = 5.0
+    max_buying_power: Decimal | None = None
+    stop_loss: Decimal | None = None
+    take_profit: Decimal | None = None
+
+    def __post_init__(self):
+        for name in ('search_interval', 'price_threshold', 'build_interval', 'reconcile_interval', 'expiry_count', 'max_symbols', 'max_quote_age'):
+            if getattr(self, name) <= 0:
+                raise ValueError(f'{name} has to be positive, got {getattr(self, name)}')
+        if self.insurance_offset < 0 or self.min_days_to_expiry < 0:
+            raise ValueError('insurance_offset and min_days_to_expiry cannot be negative')
+        # A non-positive threshold would fire on the first tick after a fill
+        for name in ('max_buying_power', 'stop_loss', 'take_profit'):
+            if getattr(self, name) is not None and getattr(self, name) <= 0:
+                raise ValueError(f'{name} has to be positive or None, got {getattr(self, name)}')
+
+    @classmethod
+    def from_section(cls, section: configparser.SectionProxy):
+        converters = {
+            'search_interval': int,
+            'price_threshold': float,
+            'insurance_offset': int,
+            'build_interval': float,
+            'reconcile_interval': float,
+            'expiry_count': int,
+            'min_days_to_expiry': int,
+            'max_symbols': int,
+            'max_quote_age': float,
+            'max_buying_power': _optional_decimal,
+            'stop_loss': _optional_decimal,
+            'take_profit': _optional_decimal,
+        }
+        unknown = set(section) - set(converters) - set(section.parser.defaults())
+        if unknown:
+            print(f'Ignoring unknown strategy parameters {sorted(unknown)}')
+        # Missing keys keep their defaults
+        return cls(**{name: convert(section[name]) for name, convert in converters.items() if name in section})
+
+    def changed(self, other: 'StrategyParameters') -> set[str]:
+        return {f.name for f in fields(self) if getattr(self, f.name) != getattr(other, f.name)}
+
+
+@dataclass
+class StrategyParametersWatcher:
+    path: str
+    section: str = 'Strategy'
+    poll_interval: float = 1.0
+    parameters: StrategyParameters | None = None
+    mtime: int | None = None
+    subscribers: list[Callable[[StrategyParameters], Awaitable[None]]] = field(default_factory=list)
+
+    def load(self) -> StrategyParameters:
+        self.mtime = os.stat(self.path).st_mtime_ns
+        # A private parser, TTConfig's is shared at class level
+        config = configparser.ConfigParser()
+        config.read(self.path)
+        if config.has_section(self.section):
+            self.parameters = StrategyParameters.from_section(config[self.section])
+        else:
+            self.parameters = StrategyParameters()
+        return self.parameters
+
+    def subscribe(self, callback: Callable[[StrategyParameters], Awaitable[None]]):
+        self.subscribers.append(callback)
+
+    async def watch(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                if os.stat(self.path).st_mtime_ns == self.mtime:
+                    continue
+                previous = self.parameters
+                parameters = self.load()
+            except (OSError, ValueError, ArithmeticError, configparser.Error) as e:
+                # Keep running on the last good parameters until the file is fixed
+                print(f'Could not reload strategy parameters: {e!r}')
+                continue
+            if previous is not None and not parameters.changed(previous):
+                continue
+            print(f'Reloaded strategy parameters: {parameters}')
+            for callback in self.subscribers:
+                try:
+                    await callback(parameters)
+                except Exception as e:
+                    # One failing subscriber must not stop hot reload for the rest of the session
+                    print(f'Could not apply strategy parameters in {callback.__qualname__}: {e!r}')
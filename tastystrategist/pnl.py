@@ -0,0 +1,106 @@
+from dataclasses import dataclass
+from decimal import Decimal, ROUND_FLOOR
+from typing import Callable
+
+from tastytrade.dxfeed import Quote
+from tastytrade.order import OrderAction, PlacedOrder
+
+from tastystrategist.symbols import occ_to_streamer_symbol
+
+MULTIPLIER = Decimal('100.0')
+
+
+@dataclass
+class PnLLeg:
+    streamer_symbol: str
+    long: bool
+    quantity: Decimal
+    fill_price: Decimal
+    # What closing the leg at the current quote is worth, in dollars
+    close_value: Decimal = Decimal('0.0')
+
+    @property
+    def open_value(self) -> Decimal:
+        value = self.fill_price * self.quantity * MULTIPLIER
+        return -value if self.long else value
+
+    # Long legs are sold at the bid, short legs bought back at the ask
+    def closing_value(self, quote: Quote) -> Decimal:
+        if self.long:
+            return quote.bid_price * self.quantity * MULTIPLIER
+        return -quote.ask_price * self.quantity * MULTIPLIER
+
+
+@dataclass
+class PnLEngine:
+    legs: dict[str, PnLLeg]
+    open_value: Decimal
+    close_value: Decimal
+    high_water_mark: Decimal
+    # Dollar thresholds on the open P&L, None disables them
+    stop_loss: Decimal | None = None
+    take_profit: Decimal | None = None
+    on_trigger: Callable[[str, Decimal], None] | None = None
+    triggered: bool = False
+
+    @classmethod
+    def from_order(
+        cls,
+        order: PlacedOrder,
+        quotes: dict[str, Quote],
+        stop_loss: Decimal | None = None,
+        take_profit: Decimal | None = None,
+        on_trigger: Callable[[str, Decimal], None] | None = None,
+    ):
+        legs = {}
+        for leg in order.legs:
+            quantity = sum((f.quantity for f in leg.fills), Decimal('0.0'))
+            fill_price = sum((f.quantity * f.fill_price for f in leg.fills), Decimal('0.0')) / quantity
+            streamer_symbol = occ_to_streamer_symbol(leg.symbol)
+            legs[streamer_symbol] = PnLLeg(streamer_symbol, leg.action == OrderAction.BUY_TO_OPEN, quantity, fill_price)
+
+        open_value = sum((leg.open_value for leg in legs.values()), Decimal('0.0'))
+        for leg in legs.values():
+            leg.close_value = leg.closing_value(quotes[leg.streamer_symbol])
+        close_value = sum((leg.close_value for leg in legs.values()), Decimal('0.0'))
+
+        return cls(legs, open_value, close_value, open_value + close_value, stop_loss, take_profit, on_trigger)
+
+    @property
+    def value(self) -> Decimal:
+        return self.open_value + self.close_value
+
+    @property
+    def drawdown(self) -> Decimal:
+        return self.high_water_mark - self.value
+
+    # Per-share limit that closes at the current mark, rounded to the tick on the marketable side.
+    # Negative is a debit, matching IronCondor.closing_order.
+    def closing_limit(self, tick: Decimal = Decimal('0.05')) -> Decimal:
+        quantity = next(iter(self.legs.values())).quantity
+        price = self.close_value / (MULTIPLIER * quantity)
+        return (price / tick).to_integral_value(rounding=ROUND_FLOOR) * tick
+
+    # Called for every quote of one of our legs, only that leg's contribution is recomputed
+    def update(self, quote: Quote):
+        leg = self.legs.get(quote.event_symbol)
+        if leg is None:
+            return
+        close_value = leg.closing_value(quote)
+        self.close_value += close_value - leg.close_value
+        leg.close_value = close_value
+
+        value = self.value
+        if value > self.high_water_mark:
+            self.high_water_mark = value
+        self._check_triggers(value)
+
+    def _check_triggers(self, value: Decimal):
+        if self.triggered or self.on_trigger is None:
+            return
+        if self.stop_loss is not None and value <= -self.stop_loss:
+            self.triggered = True
+            self.on_trigger('Stop-loss', value)
+        elif self.take_profit is not None and value >= self.take_profit:
+            self.triggered = True
+            self.on_trigger('Take-profit', value)
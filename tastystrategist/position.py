@@ -7,6 +7,10 @@ from functools import total_ordering
 from tastytrade.instruments import Option
 from tastytrade.order import NewOrder, OrderAction, OrderTimeInForce, OrderType
 
+# Default limit prices per share, positive is a credit
+OPENING_LIMIT = Decimal('0.05')
+CLOSING_LIMIT = Decimal('-0.05')
+
 @dataclass
 class IronCondor:
     insurance_put: Option
@@ -25,6 +29,9 @@ class IronCondor:
         self.main_call = main_call
         self.insurance_call = insurance_call
 
+    def options(self) -> list[Option]:
+        return [self.insurance_put, self.main_put, self.main_call, self.insurance_call]
+
     def _order(self, open: bool, limit: Decimal) -> NewOrder:
         # Negative decimal to close position
         leg_put_buy = self.insurance_put.build_leg(Decimal(1), OrderAction.BUY_TO_OPEN if open else OrderAction.SELL_TO_CLOSE)
@@ -40,11 +47,11 @@ class IronCondor:
         )
     
     # Opening Iron Condor gives money
-    def opening_order(self, limit: Decimal = Decimal('0.05')):
+    def opening_order(self, limit: Decimal = OPENING_LIMIT):
         return self._order(True, limit)
     
     # Closing Iron Condor consts money
-    def closing_order(self, limit: Decimal = Decimal('-0.05')):
+    def closing_order(self, limit: Decimal = CLOSING_LIMIT):
         return self._order(False, limit)
     
 
@@ -1,8 +1,7 @@
 import asyncio
 import tkinter as tk
-from datetime import date, timedelta
-from dataclasses import dataclass
-from typing import List
+from datetime import date
+from dataclasses import dataclass, field
 from decimal import Decimal
 
 from tastytrade import Session, Account
@@ -13,7 +12,13 @@ from tastytrade.utils import TastytradeError
 
 from tastystrategist.streamer import LivePrices
 from tastystrategist.streamer import AccountUpdates
-from tastystrategist.position import IronCondor, PositionState
+from tastystrategist.streamer import SubscriptionManager
+from tastystrategist.position import IronCondor, PositionState, OPENING_LIMIT
+from tastystrategist.chain import ExpiryIndex, select_expiries
+from tastystrategist.margin import IronCondorRisk, iron_condor_credit, iron_condor_risk
+from tastystrategist.pnl import PnLEngine
+from tastystrategist.parameters import StrategyParameters
+from tastystrategist.symbols import bulk_symbols
 
 
 @dataclass
@@ -49,8 +54,8 @@ class PositionManager:
         return response
 
     # Can raise an exception from the account place_order part
-    async def close_position(self, session: Session, account: Account, dry_run=True) -> PlacedOrderResponse:
-        order = self.position.closing_order()
+    async def close_position(self, session: Session, account: Account, dry_run=True, limit: Decimal | None = None) -> PlacedOrderResponse:
+        order = self.position.closing_order() if limit is None else self.position.closing_order(limit)
         response = await account.a_place_order(session, order, dry_run)
         self.close_response = response
         if not dry_run:
@@ -61,18 +66,6 @@ class PositionManager:
             self.state = PositionState.CLOSED
         return response
     
-    async def margin_requirement(self, session: Session, account: Account):
-        if self.state < PositionState.PENDING:
-            return None
-        if self.position is None or self.open_response is None:
-            await self.open_position(session, account, dry_run=True)
-        return self.open_response.buying_power_effect.change_in_buying_power
-    
-    def margin_requirement_no_wait(self):
-        if self.open_response is None:
-            return None
-        return self.open_response.buying_power_effect.change_in_buying_power
-    
     def get_open_order(self) -> PlacedOrder:
         if self.state <= PositionState.PENDING:
             return None
@@ -145,10 +138,25 @@ class Strategist:
     live_prices: LivePrices
     underlying_symbol: str
     root_symbol: str
-    options: List[Option]
+    expiries: dict[date, ExpiryIndex]
+    # The full chain, kept so expiry changes don't need another fetch
+    chain: dict[date, list[Option]]
     position_manager: PositionManager | None = None
     sandbox_account: Account | None = None
     session_sandbox: Session | None = None
+    subscriptions: SubscriptionManager | None = None
+    # Swapped as a whole on reload, read once per loop iteration
+    parameters: StrategyParameters = field(default_factory=StrategyParameters)
+    # Server minus local buying power at the last reconciliation
+    margin_drift: Decimal | None = None
+    pnl: PnLEngine | None = None
+    # True from the moment a live closing order is decided on until it is filled or fails
+    closing: bool = False
+    _close_task: asyncio.Task | None = None
+    # Set and replaced on every reload to wake the loops early
+    _parameters_changed: asyncio.Event = field(default_factory=asyncio.Event)
+    # Short strike found per (expiry, side) in the last build, where the next search starts
+    _short_strikes: dict[tuple[date, OptionType], Decimal] = field(default_factory=dict)
 
     @classmethod
     async def create(
@@ -158,7 +166,9 @@ class Strategist:
         account_sandbox: Account,
         underlying_symbol: str,
         root_symbol: str,
+        parameters: StrategyParameters | None = None,
     ):
+        parameters = parameters or StrategyParameters()
         live_prices = await LivePrices.create(session, [underlying_symbol])
         print('Initialized live prices')
 
@@ -166,14 +176,18 @@ class Strategist:
         print(f'{underlying_symbol} is at {reference_price}')
 
         # Blocking call
-        options = get_option_chain(session_sandbox, root_symbol)[date.today() + timedelta(days=1)]
-        # print(f'Options fetched: {options}')
+        chain = get_option_chain(session_sandbox, root_symbol)
+        expiries = select_expiries(chain, parameters.expiry_count, parameters.min_days_to_expiry)
+        print(f'Scanning expiries: {[str(e) for e in expiries]}')
 
         account_updates = await AccountUpdates.create(session_sandbox, account_sandbox)
         position_manager = PositionManager(account_updates)
         print('Initialized account updates')
 
-        self = cls(live_prices, underlying_symbol, root_symbol, options, position_manager, account_sandbox, session_sandbox)
+        subscriptions = SubscriptionManager(live_prices, parameters.search_interval, max_symbols=parameters.max_symbols)
+
+        self = cls(live_prices, underlying_symbol, root_symbol, expiries, chain, position_manager, account_sandbox, session_sandbox, subscriptions, parameters)
+        self._generate_symbols(list(expiries))
         
         print('Starting strategy loop...')
         await self._build_strategy()
@@ -181,19 +195,83 @@ class Strategist:
         
         # Start the continuous build options loop
         asyncio.create_task(self._run_build_strategy())
-        asyncio.create_task(self._run_margin_requirement(session_sandbox, account_sandbox))
+        asyncio.create_task(self._run_margin_reconciliation(session_sandbox, account_sandbox))
         
         return self
 
-    async def _run_margin_requirement(self, session: Session, account: Account):
+    async def _run_margin_reconciliation(self, session: Session, account: Account):
         while True:
-            await self.compute_margin_requirement(session, account)
-            await asyncio.sleep(0.3)
+            try:
+                await self.reconcile_margin_requirement(session, account)
+            except Exception as e:
+                # Keep the loop alive across network errors
+                print(f'Error reconciling margin: {e!r}')
+            await self._sleep(self.parameters.reconcile_interval)
 
-    async def _run_build_strategy(self, update_interval: int = 3):
+    async def _run_build_strategy(self):
         while True:
-            await self._build_strategy()
-            await asyncio.sleep(update_interval)
+            try:
+                await self._build_strategy()
+            except Exception as e:
+                # Keep the loop alive across stream reconnects
+                print(f'Error building strategy: {e!r}')
+            await self._sleep(self.parameters.build_interval)
+
+    # Sleeps for the interval, or until new parameters arrive
+    async def _sleep(self, interval: float):
+        try:
+            await asyncio.wait_for(self._parameters_changed.wait(), interval)
+        except TimeoutError:
+            pass
+
+    # Streams, subscriptions and open positions are kept, only what the change touches is rebuilt
+    async def apply_parameters(self, parameters: StrategyParameters):
+        changed = parameters.changed(self.parameters)
+        if not changed:
+            return
+        # No awaits until the swap is complete, so every loop sees either the old or the new set
+        self.parameters = parameters
+        dropped = []
+        if changed & {'expiry_count', 'min_days_to_expiry'}:
+            # From the cached chain, no fetch needed
+            expiries = select_expiries(self.chain, parameters.expiry_count, parameters.min_days_to_expiry)
+            dropped = [index for expiration, index in self.expiries.items() if expiration not in expiries]
+            added = [e for e in expiries if e not in self.expiries]
+            self.expiries = expiries
+            self._generate_symbols(added)
+            print(f'Scanning expiries: {[str(e) for e in self.expiries]}')
+        self.subscriptions.window = parameters.search_interval
+        self.subscriptions.max_symbols = parameters.max_symbols
+        if self.pnl is not None:
+            self.pnl.stop_loss = parameters.stop_loss
+            self.pnl.take_profit = parameters.take_profit
+        self._parameters_changed.set()
+        self._parameters_changed = asyncio.Event()
+        print(f'Applied strategy parameters, changed {sorted(changed)}')
+
+        # Near the money strikes of a dropped expiry would stay inside the window, so release them explicitly
+        pinned = self._pinned_symbols()
+        for index in dropped:
+            self._short_strikes.pop((index.expiration, OptionType.PUT), None)
+            self._short_strikes.pop((index.expiration, OptionType.CALL), None)
+            await self.subscriptions.release([o.streamer_symbol for o in index.puts + index.calls if o.streamer_symbol not in pinned])
+
+    # Fills the codec caches with one bulk call when expiries are selected,
+    # so order legs and P&L lookups near the money never format a symbol on the hot path
+    def _generate_symbols(self, expirations: list[date]):
+        if not expirations:
+            return
+        reference_price = self.get_reference_price()
+        window = self.parameters.search_interval
+        strikes = {o.strike_price for e in expirations for o in self.chain[e] if abs(o.strike_price - reference_price) <= window}
+        bulk_symbols(self.root_symbol, expirations, sorted(strikes))
+
+    def is_fresh(self, symbols: list[str]) -> bool:
+        return all(self.live_prices.quote_age(s) <= self.parameters.max_quote_age for s in symbols)
+
+    def is_position_fresh(self) -> bool:
+        position = self.position_manager.position
+        return position is not None and self.is_fresh([o.streamer_symbol for o in position.options()])
 
     def get_reference_price(self):
         return (self.live_prices.quotes[self.underlying_symbol].bid_price + self.live_prices.quotes[self.underlying_symbol].ask_price) / 2
@@ -216,61 +294,241 @@ class Strategist:
         quote = self.live_prices.quotes[self.position_manager.position.insurance_call.streamer_symbol]
         return quote.ask_price if buy else quote.bid_price
     
-    async def compute_margin_requirement(self, session: Session, account: Account):
+    async def reconcile_margin_requirement(self, session: Session, account: Account, tolerance: Decimal = Decimal('1.00')):
+        if self.position_manager.state != PositionState.PENDING:
+            return
+        position = self.position_manager.position
+        local = self.local_margin_requirement()
+        # Placed directly so the dry-run never touches the position manager's live order state
         try:
-            await self.position_manager.margin_requirement(session, account)
+            response = await account.a_place_order(session, position.opening_order(), dry_run=True)
         except TastytradeError as e:
             print(f'Could not execute dry-run order. Error {e}')
+            return
+        server = abs(response.buying_power_effect.change_in_buying_power)
+        self.margin_drift = server - local
+        if abs(self.margin_drift) > tolerance:
+            print(f'Local margin model drifted by ${self.margin_drift:.2f} (server ${server:.2f}, local ${local:.2f})')
 
-    async def _build_strategy(self, search_interval: int = 500, price_threshold: float = 3.5, insurance_offset: int = 30):
+    async def _build_strategy(self):
+        parameters = self.parameters
+        if not self.is_fresh([self.underlying_symbol]):
+            print(f'{self.underlying_symbol} quote is stale, skipping strategy update')
+            return
         reference_price_locked = self.get_reference_price()
         # print(f'Reference price: {reference_price_locked}')
-        
-        lower_options = [option for option in self.options if reference_price_locked - search_interval <= option.strike_price and option.strike_price <= reference_price_locked and option.option_type == OptionType.PUT]
-        lower_options.sort(key=lambda o: o.strike_price, reverse=True)
-        higher_options = [option for option in self.options if reference_price_locked <= option.strike_price and option.strike_price <= reference_price_locked + search_interval and option.option_type == OptionType.CALL]
-        higher_options.sort(key=lambda o: o.strike_price)
-
-        lower_streamer_symbols = [o.streamer_symbol for o in lower_options]
-        higher_streamer_symbols = [o.streamer_symbol for o in higher_options]
-
-        # This will be super fast except the first time
-        await self.live_prices.add_symbols(lower_streamer_symbols + higher_streamer_symbols)
+        self.subscriptions.begin_pass()
 
-        put_to_buy: Option | None = None
-        put_to_sell: Option | None = None
-        call_to_sell: Option | None = None
-        call_to_buy: Option | None = None
-        
-        for option in lower_options:
-            price = self.live_prices.quotes[option.streamer_symbol].bid_price
-            # print(f'PUT price at strike {option.strike_price}: {price}')
-            if price < price_threshold:
-                put_to_sell = option
-                insurance_strike_price = option.strike_price - insurance_offset
-                put_to_buy = next((o for o in lower_options if o.strike_price <= insurance_strike_price), None)
-                break
-        
-        for option in higher_options:
-            price = self.live_prices.quotes[option.streamer_symbol].bid_price
-            # print(f'CALL price at strike {option.strike_price}: {price}')
-            if price < price_threshold:
-                call_to_sell = option
-                insurance_strike_price = option.strike_price + insurance_offset
-                call_to_buy = next((o for o in higher_options if o.strike_price >= insurance_strike_price), None)
-                break
+        # All expiries are scanned in a single pass, nearest first.
+        # A later expiry holds more time value, so its short strikes can only sit at or beyond the nearer ones.
+        candidates = []
+        put_bound, call_bound = None, None
+        for index in list(self.expiries.values()):
+            # A reload may drop the expiry while the pass is under way, don't subscribe to it again
+            if index.expiration not in self.expiries:
+                continue
+            condor = await self._build_candidate(
+                index, reference_price_locked, parameters.search_interval, parameters.price_threshold, parameters.insurance_offset, put_bound, call_bound
+            )
+            if condor is not None:
+                candidates.append(condor)
+                put_bound, call_bound = condor.main_put.strike_price, condor.main_call.strike_price
+        suggested_position = max(candidates, key=self._score_candidate, default=None)
 
-        # print(f'Computed legs: {put_to_buy} {put_to_sell} {call_to_sell} {call_to_buy}')
+        # print(f'Computed legs: {suggested_position}')
 
         # Don't replace strategy after order is sent
         if self.position_manager.state <= PositionState.PENDING:
-            try:
-                suggested_position = IronCondor(put_to_buy, put_to_sell, call_to_sell, call_to_buy)
-                self.position_manager.set_position(suggested_position)
-            except Exception as e:
+            if suggested_position is None:
                 # No need to set the position_manager to None as it already is per default
-                print('Error building and testing order')
-                print(e)
+                print(f'No iron condor candidate found in expiries {[str(e) for e in self.expiries]}')
+            else:
+                self.position_manager.set_position(suggested_position)
+
+        # Drop strikes the underlying has drifted away from, never the legs we are showing or holding
+        await self.subscriptions.rebalance(reference_price_locked, self._pinned_symbols())
+
+    def _pinned_symbols(self) -> set[str]:
+        pinned = {self.underlying_symbol}
+        position = self.position_manager.position
+        if position is not None and self.position_manager.state < PositionState.CLOSED:
+            pinned.update(o.streamer_symbol for o in position.options())
+        return pinned
+
+    async def _build_candidate(
+        self,
+        index: ExpiryIndex,
+        reference_price: Decimal,
+        search_interval: int,
+        price_threshold: float,
+        insurance_offset: int,
+        put_bound: Decimal | None = None,
+        call_bound: Decimal | None = None,
+    ) -> IronCondor | None:
+        lower_options = index.puts_in_window(reference_price, search_interval)
+        higher_options = index.calls_in_window(reference_price, search_interval)
+
+        # Nothing closer to the money than the nearer expiry's short strike can qualify
+        put_start = next((i for i, o in enumerate(lower_options) if put_bound is None or o.strike_price <= put_bound), len(lower_options))
+        call_start = next((i for i, o in enumerate(higher_options) if call_bound is None or o.strike_price >= call_bound), len(higher_options))
+
+        # Skip the expiry before subscribing to anything when no short strike left past the bound has room for its insurance leg
+        if put_start == len(lower_options) or lower_options[put_start].strike_price - lower_options[-1].strike_price < insurance_offset:
+            return None
+        if call_start == len(higher_options) or higher_options[-1].strike_price - higher_options[call_start].strike_price < insurance_offset:
+            return None
+
+        put_key, call_key = (index.expiration, OptionType.PUT), (index.expiration, OptionType.CALL)
+        put_to_sell = await self._find_threshold_option(lower_options, price_threshold, put_start, self._short_strikes.get(put_key))
+        if put_to_sell is None:
+            return None
+        call_to_sell = await self._find_threshold_option(higher_options, price_threshold, call_start, self._short_strikes.get(call_key))
+        if call_to_sell is None:
+            return None
+        self._short_strikes[put_key] = put_to_sell.strike_price
+        self._short_strikes[call_key] = call_to_sell.strike_price
+
+        insurance_strike_price = put_to_sell.strike_price - insurance_offset
+        put_to_buy = next((o for o in lower_options if o.strike_price <= insurance_strike_price), None)
+        insurance_strike_price = call_to_sell.strike_price + insurance_offset
+        call_to_buy = next((o for o in higher_options if o.strike_price >= insurance_strike_price), None)
+        if put_to_buy is None or call_to_buy is None:
+            return None
+
+        # Insurance legs are needed for scoring
+        await self.subscriptions.require([put_to_buy, call_to_buy])
+        condor = IronCondor(put_to_buy, put_to_sell, call_to_sell, call_to_buy)
+        if not self.is_fresh([o.streamer_symbol for o in condor.options()]):
+            return None
+        return condor
+
+    # Options are ordered from the money outwards, so bids only fall along the list.
+    # Bisecting for the first one under the threshold subscribes to O(log n) strikes instead of the whole window.
+    async def _find_threshold_option(self, options: list[Option], price_threshold: float, start: int = 0, hint: Decimal | None = None) -> Option | None:
+        lo, hi = start, len(options) - 1
+        if lo > hi:
+            return None
+
+        # Warm start from the last build: two already subscribed quotes confirm an unchanged short strike
+        i = next((i for i in range(lo, hi + 1) if options[i].strike_price == hint), None)
+        if i is not None:
+            if await self._get_bid_price(options[i]) < price_threshold:
+                if i == lo or await self._get_bid_price(options[i - 1]) >= price_threshold:
+                    return options[i]
+                hi = i
+            else:
+                lo = i + 1
+                if lo > hi:
+                    return None
+
+        if lo > 0:
+            # The answer is usually just past the anchor, gallop outwards so the probes stay near it
+            step, i = 1, lo
+            while await self._get_bid_price(options[i]) >= price_threshold:
+                if i == hi:
+                    return None
+                lo, i = i + 1, min(i + step, hi)
+                step *= 2
+            hi = i
+        # Even the furthest strike is too expensive, nothing in this window qualifies
+        elif await self._get_bid_price(options[hi]) >= price_threshold:
+            return None
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if await self._get_bid_price(options[mid]) < price_threshold:
+                hi = mid
+            else:
+                lo = mid + 1
+        return options[lo]
+
+    async def _get_bid_price(self, option: Option) -> Decimal:
+        # This will be super fast except the first time
+        await self.subscriptions.require([option])
+        quote = self.live_prices.quotes.get(option.streamer_symbol)
+        if quote is None:
+            raise LookupError(f'{option.streamer_symbol} was unsubscribed while waiting for its quote')
+        return quote.bid_price
+
+    # Return on buying power from the local margin model, comparable across expiries
+    def _score_candidate(self, condor: IronCondor) -> Decimal:
+        risk = iron_condor_risk(condor, iron_condor_credit(condor, self.live_prices.quotes))
+        # A credit wider than the wings means broken quotes, rank it last
+        return risk.return_on_risk if risk.return_on_risk is not None else Decimal('-Infinity')
+
+    # Risk of the opening order as it will be sent, which is what the broker holds
+    def local_risk(self, limit: Decimal = OPENING_LIMIT) -> IronCondorRisk | None:
+        if self.position_manager.position is None:
+            return None
+        return iron_condor_risk(self.position_manager.position, limit)
+
+    # Zero-latency margin estimate, the server dry-run only reconciles it periodically
+    def local_margin_requirement(self) -> Decimal | None:
+        risk = self.local_risk()
+        return risk.buying_power if risk is not None else None
+
+    async def open_position(self, dry_run=True) -> PlacedOrderResponse:
+        # Pre-trade checks against live quotes and the local model, no round trip needed
+        if not self.is_position_fresh():
+            raise ValueError('Refusing to open a position on stale quotes')
+        buying_power = self.local_margin_requirement()
+        max_buying_power = self.parameters.max_buying_power
+        if max_buying_power is not None and buying_power is not None and buying_power > max_buying_power:
+            raise ValueError(f'Buying power ${buying_power:.2f} exceeds the limit of ${max_buying_power:.2f}')
+        response = await self.position_manager.open_position(self.session_sandbox, self.sandbox_account, dry_run)
+        if not dry_run:
+            self._attach_pnl()
+        return response
+
+    async def close_position(self, dry_run=True, limit: Decimal | None = None) -> PlacedOrderResponse:
+        if dry_run:
+            return await self.position_manager.close_position(self.session_sandbox, self.sandbox_account, dry_run, limit)
+        if self.closing:
+            raise ValueError('A closing order is already in flight')
+        self.closing = True
+        return await self._close(limit)
+
+    # Callers set closing before the first await, so no second closing order can slip in
+    async def _close(self, limit: Decimal | None) -> PlacedOrderResponse:
+        try:
+            response = await self.position_manager.close_position(self.session_sandbox, self.sandbox_account, False, limit)
+        finally:
+            self.closing = False
+        self._detach_pnl()
+        return response
+
+    # From here on the mark moves with each tick of our legs instead of being recomputed per call
+    def _attach_pnl(self):
+        self.pnl = PnLEngine.from_order(
+            self.position_manager.get_open_order(),
+            self.live_prices.quotes,
+            self.parameters.stop_loss,
+            self.parameters.take_profit,
+            self._on_pnl_trigger,
+        )
+        self.live_prices.add_listener(list(self.pnl.legs), self.pnl.update)
+
+    def _detach_pnl(self):
+        if self.pnl is not None:
+            self.live_prices.remove_listener(self.pnl.update)
+
+    def _on_pnl_trigger(self, reason: str, value: Decimal):
+        # The user may be closing it already
+        if self.position_manager.state != PositionState.OPEN or self.closing:
+            return
+        # A fixed small debit won't fill on a losing condor, pay the current mark instead
+        limit = self.pnl.closing_limit()
+        print(f'{reason} hit at ${value:.2f}, closing position at {limit}')
+        self.closing = True
+        self._close_task = asyncio.create_task(self._close_on_trigger(limit))
+
+    async def _close_on_trigger(self, limit: Decimal):
+        try:
+            await self._close(limit)
+        except Exception as e:
+            print(f'Automatic close failed: {e!r}')
+            # Let the next tick fire again
+            if self.pnl is not None:
+                self.pnl.triggered = False
 
     def buying_power_effect(self):
         # Return None if position is not closed
@@ -279,9 +537,11 @@ class Strategist:
         return self.buying_power_effect_open() + self.buying_power_effect_close()
 
     def estimated_buying_power_effect(self):
-        # Return None if position is not open
-        if self.buying_power_effect_open() is None:
+        # Return None if position is not open or its quotes can't be trusted
+        if self.buying_power_effect_open() is None or not self.is_position_fresh():
             return None
+        if self.pnl is not None:
+            return self.pnl.value
         return self.buying_power_effect_open() + self.estimated_buying_power_effect_close()
 
     def buying_power_effect_close(self):
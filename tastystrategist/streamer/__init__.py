@@ -1,2 +1,3 @@
 from .account_updates import AccountUpdates, AlertStreamer
-from .live_prices import LivePrices
\ No newline at end of file
+from .live_prices import LivePrices
+from .subscriptions import SubscriptionManager
\ No newline at end of file
@@ -1,18 +1,27 @@
 import asyncio
+import time
 from dataclasses import dataclass
 from decimal import Decimal
 
 from tastytrade import AlertStreamer, Session, Account
-from tastytrade.order import NewOrder, OrderAction, OrderTimeInForce, OrderType, PlacedOrderResponse, PlacedOrder
+from tastytrade.order import NewOrder, OrderAction, OrderTimeInForce, OrderType, PlacedOrderResponse, PlacedOrder, OrderStatus
 from tastytrade.account import CurrentPosition
 
+from .reconnect import reconnect_with_backoff, run_until_disconnected
+
 @dataclass
 class AccountUpdates:
     streamer: AlertStreamer
     orders: dict[int, PlacedOrder]
     positions: dict[str, CurrentPosition]
-    update_orders_task: asyncio.Task | None = None
-    update_positions_task: asyncio.Task | None = None
+    session: Session | None = None
+    account: Account | None = None
+    update_task: asyncio.Task | None = None
+    connected_at: float = 0.0
+    # Seconds between REST checks that the stream hasn't silently missed order updates
+    heartbeat_interval: float = 30.0
+    reconnect_delay: float = 0.5
+    max_reconnect_delay: float = 30.0
 
     @classmethod
     async def create(
@@ -23,10 +32,13 @@ class AccountUpdates:
         streamer = await AlertStreamer(session)
         await streamer.subscribe_accounts([account])
 
-        self = cls(streamer, {}, {})
+        self = cls(streamer, {}, {}, session, account)
+        # Orders from earlier today, or from a previous run, would otherwise look missed to the first heartbeat
+        orders, positions = await self._resync()
+        self.connected_at = time.monotonic()
+        print(f'Loaded {orders} orders and {positions} positions')
 
-        self.update_orders_task = asyncio.Task(self._update_orders())
-        self.update_positions_task = asyncio.Task(self._update_positions())
+        self.update_task = asyncio.create_task(self._supervise())
 
         return self
 
@@ -37,29 +49,71 @@ class AccountUpdates:
             if position.quantity > Decimal('0.0'):
                 num += 1
         return num
+
+    async def _supervise(self):
+        while True:
+            try:
+                await run_until_disconnected(self.streamer, self._update_orders(), self._update_positions(), self._heartbeat())
+            except Exception as e:
+                print(f'Account stream dropped: {e!r}')
+            # Don't spin when a fresh connection drops straight away
+            if time.monotonic() - self.connected_at < self.max_reconnect_delay:
+                await asyncio.sleep(self.reconnect_delay)
+            await reconnect_with_backoff(self._reconnect, 'Account stream', self.reconnect_delay, self.max_reconnect_delay)
     
     async def _update_orders(self):
-        try:
-            async for e in self.streamer.listen(PlacedOrder):
-                self.orders[e.id] = e
-        except asyncio.CancelledError:
-            # Maybe we need some cleanup here?
-            raise asyncio.CancelledError
+        async for e in self.streamer.listen(PlacedOrder):
+            self.orders[e.id] = e
         
     async def _update_positions(self):
+        async for e in self.streamer.listen(CurrentPosition):
+            self.positions[e.symbol] = e
+
+    # The alert stream can be quiet for hours, so silence proves nothing.
+    # Instead compare against one bulk fetch: an order the stream never told us about means the socket is dead.
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            statuses = {o.id: o.status for o in await self.account.a_get_live_orders(self.session)}
+            missed = self._missed_orders(statuses)
+            if missed:
+                # A fresh update may still be in flight, only trust a mismatch that survives a second look
+                await asyncio.sleep(self.reconnect_delay * 4)
+                missed = self._missed_orders({i: statuses[i] for i in missed})
+            if missed:
+                raise ConnectionError(f'Account stream missed updates for orders {missed}')
+
+    def _missed_orders(self, statuses: dict[int, OrderStatus]) -> list[int]:
+        return [i for i, status in statuses.items() if i not in self.orders or self.orders[i].status != status]
+
+    async def _reconnect(self):
         try:
-            async for e in self.streamer.listen(CurrentPosition):
-                self.positions[e.symbol] = e
-        except asyncio.CancelledError:
-            # Maybe we need some cleanup here?
-            raise asyncio.CancelledError
+            await self.streamer.close()
+        except Exception:
+            pass
+        self.streamer = await AlertStreamer(self.session)
+        await self.streamer.subscribe_accounts([self.account])
+        orders, positions = await self._resync()
+        self.connected_at = time.monotonic()
+        print(f'Reconnected account stream, resynced {orders} orders and {positions} positions')
+
+    # Called after subscribing so nothing is missed, one bulk fetch each for orders and positions.
+    # Events queued in the meantime are newer and get applied once the listeners start.
+    async def _resync(self) -> tuple[int, int]:
+        orders, positions = await asyncio.gather(
+            self.account.a_get_live_orders(self.session),
+            self.account.a_get_positions(self.session),
+        )
+        self.orders.update({o.id: o for o in orders})
+        self.positions.clear()
+        self.positions.update({p.symbol: p for p in positions})
+        return len(orders), len(positions)
         
     async def close_channel(self):
-        self.update_orders_task.cancel()
-        self.update_positions_task.cancel()
+        self.update_task.cancel()
         try:
-            await self.update_orders_task
-            await self.update_positions_task
+            await self.update_task
             await self.streamer.close()
         except asyncio.CancelledError:
+            await self.streamer.close()
             print('Closed account update task')
@@ -1,5 +1,8 @@
 import asyncio
-from dataclasses import dataclass
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Callable
 
 from tastytrade import DXLinkStreamer
 from tastytrade.dxfeed import Greeks, Quote
@@ -9,13 +12,14 @@ from tastytrade.instruments import Option, Equity
 from TTOrder import TTOption, TTOptionSide
 from TTConfig import TTConfig
 
+from .reconnect import reconnect_with_backoff, run_until_disconnected
+
 
 class TastytradeWrapper:
     @classmethod
     async def get_streamer_symbols_options(cls, session: Session, tt_options: list[TTOption]):
-        occ_symbols = [o.symbol for o in tt_options]
-        options = await Option.a_get_options(session, occ_symbols)
-        return [o.streamer_symbol for o in options]
+        # Streamer symbols are derived locally from the OCC symbol, no API round trip needed
+        return [o.streamer_symbol for o in tt_options]
     
     @classmethod
     async def get_options(cls, session: Session, tt_options: list[TTOption]):
@@ -34,18 +38,34 @@ class LivePrices:
     streamer: DXLinkStreamer
     update_task: asyncio.Task | None
     streamer_symbols: list[Option]
+    session: Session | None = None
+    # Monotonic receive time per symbol, see quote_age
+    received_at: dict[str, float] = field(default_factory=dict)
+    last_event_at: float = 0.0
+    connected_at: float = 0.0
+    connected: asyncio.Event = field(default_factory=asyncio.Event)
+    # Off by default, dropped sockets already end the streamer's reader task and a quiet tape is not a dead one.
+    # Only worth setting during market hours, and well above the quietest stretch of the symbols.
+    heartbeat_timeout: float | None = None
+    reconnect_delay: float = 0.5
+    max_reconnect_delay: float = 30.0
+    # Per-symbol callbacks run on every quote, keep them cheap
+    listeners: dict[str, list[Callable[[Quote], None]]] = field(default_factory=dict)
 
     @classmethod
     async def create(
         cls,
         session: Session,
         streamer_symbols: list[str],
+        heartbeat_timeout: float | None = None,
     ):
         streamer = await DXLinkStreamer(session)
         await streamer.subscribe(Quote, streamer_symbols)
         print(f'Subscribed to {streamer_symbols}')
         
-        self = cls({}, streamer, None, streamer_symbols)
+        self = cls({}, streamer, None, streamer_symbols, session, heartbeat_timeout=heartbeat_timeout)
+        self.connected_at = time.monotonic()
+        self.connected.set()
 
         self.update_task = asyncio.create_task(self._update_quotes())
 
@@ -57,22 +77,98 @@ class LivePrices:
 
     async def _update_quotes(self):
         try:
-            print('Listening for quotes...')
-            async for e in self.streamer.listen(Quote):
-                self.quotes[e.event_symbol] = e
+            while True:
+                try:
+                    print('Listening for quotes...')
+                    await run_until_disconnected(self.streamer, self._listen_quotes())
+                except TimeoutError:
+                    print(f'No quotes for {self.heartbeat_timeout}s, assuming the stream is dead')
+                except Exception as e:
+                    print(f'Quote stream dropped: {e!r}')
+                self.connected.clear()
+                # Don't spin when a fresh connection drops straight away
+                if time.monotonic() - self.connected_at < self.max_reconnect_delay:
+                    await asyncio.sleep(self.reconnect_delay)
+                await reconnect_with_backoff(self._reconnect, 'Quote stream', self.reconnect_delay, self.max_reconnect_delay)
         except asyncio.CancelledError:
-            await self.streamer.unsubscribe_all(Quote)
-            await self.streamer.close()
+            # May be cancelled mid-reconnect with a closed or half built streamer
+            try:
+                await self.streamer.unsubscribe_all(Quote)
+                await self.streamer.close()
+            except Exception:
+                pass
             print('Unsubscribed from qoutes')
             raise asyncio.CancelledError
-        
+
+    async def _listen_quotes(self):
+        events = aiter(self.streamer.listen(Quote))
+        while True:
+            e = await asyncio.wait_for(anext(events), self.heartbeat_timeout)
+            now = time.monotonic()
+            self.quotes[e.event_symbol] = e
+            self.received_at[e.event_symbol] = now
+            self.last_event_at = now
+            for listener in self.listeners.get(e.event_symbol, ()):
+                try:
+                    listener(e)
+                except Exception as ex:
+                    print(f'Quote listener failed for {e.event_symbol}: {ex!r}')
+
+    async def _reconnect(self):
+        try:
+            await self.streamer.close()
+        except Exception:
+            pass
+        self.streamer = await DXLinkStreamer(self.session)
+        # The whole symbol set in one batch, the snapshot that follows refreshes every quote
+        await self.streamer.subscribe(Quote, list(self.streamer_symbols))
+        self.connected_at = time.monotonic()
+        self.connected.set()
+        print(f'Reconnected quote stream with {len(self.streamer_symbols)} symbols')
+
+    def add_listener(self, streamer_symbols: list[str], listener: Callable[[Quote], None]):
+        for symbol in streamer_symbols:
+            self.listeners.setdefault(symbol, []).append(listener)
+
+    def remove_listener(self, listener: Callable[[Quote], None]):
+        for symbol in list(self.listeners):
+            self.listeners[symbol] = [l for l in self.listeners[symbol] if l != listener]
+            if not self.listeners[symbol]:
+                del self.listeners[symbol]
+
+    # Seconds since the quote was last known to be current.
+    # DXLink only sends a quote when it changes, so a quiet strike on a live connection is as fresh as the stream.
+    def quote_age(self, symbol: str) -> float:
+        received = self.received_at.get(symbol)
+        if received is None:
+            return math.inf
+        now = time.monotonic()
+        if self.connected.is_set() and received >= self.connected_at:
+            return now - self.last_event_at
+        return now - received
+
     async def add_symbols(self, streamer_symbols: list[str]):
         new_streamer_symbols = list(set(streamer_symbols) - set(self.streamer_symbols))
-        await self.streamer.subscribe(Quote, new_streamer_symbols)
-        self.streamer_symbols += new_streamer_symbols
-        while len(self.quotes) != len(self.streamer_symbols):
+        if new_streamer_symbols:
+            # Register before awaiting so concurrent callers don't subscribe the same symbols twice
+            self.streamer_symbols += new_streamer_symbols
+            await self.connected.wait()
+            await self.streamer.subscribe(Quote, new_streamer_symbols)
+        # A concurrent remove_symbols drops the symbol from the set, its quote will never arrive
+        while any(s not in self.quotes and s in self.streamer_symbols for s in streamer_symbols):
             await asyncio.sleep(0.1)
         # print(f'Successfully added the symbols {new_streamer_symbols}')
+
+    async def remove_symbols(self, streamer_symbols: list[str]):
+        removed = set(streamer_symbols) & set(self.streamer_symbols)
+        if not removed:
+            return
+        self.streamer_symbols = [s for s in self.streamer_symbols if s not in removed]
+        await self.connected.wait()
+        await self.streamer.unsubscribe(Quote, list(removed))
+        for symbol in removed:
+            self.quotes.pop(symbol, None)
+            self.received_at.pop(symbol, None)
         
     async def close_channel(self):
         self.update_task.cancel()
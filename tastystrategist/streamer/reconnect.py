@@ -0,0 +1,42 @@
+import asyncio
+from typing import Awaitable, Callable, Coroutine
+
+
+# Runs the listeners until one of them fails or the streamer's socket goes away, then raises
+async def run_until_disconnected(streamer, *listeners: Coroutine):
+    tasks = [asyncio.create_task(listener) for listener in listeners]
+    # The SDK doesn't expose it, but its reader task ending is the earliest sign of a dropped socket
+    connection = getattr(streamer, '_connect_task', None)
+    if not isinstance(connection, asyncio.Task):
+        print(f'{type(streamer).__name__} has no _connect_task, drops are only seen by the listeners and heartbeats')
+        connection = None
+    waiters = tasks + ([connection] if connection is not None else [])
+    try:
+        done, _ = await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        # Drain them so their errors are retrieved here and not at shutdown
+        await asyncio.gather(*tasks, return_exceptions=True)
+    for task in done:
+        if not task.cancelled() and task.exception() is not None:
+            raise task.exception()
+    raise ConnectionError('Streamer disconnected')
+
+
+async def reconnect_with_backoff(
+    reconnect: Callable[[], Awaitable[None]],
+    name: str,
+    initial_delay: float = 0.5,
+    max_delay: float = 30.0,
+):
+    # First attempt is immediate so a plain drop recovers in about a second
+    delay = initial_delay
+    while True:
+        try:
+            await reconnect()
+            return
+        except Exception as e:
+            print(f'{name} reconnect failed ({e!r}), retrying in {delay}s')
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, max_delay)
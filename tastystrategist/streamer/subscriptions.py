@@ -0,0 +1,72 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+from tastytrade.instruments import Option
+
+from .live_prices import LivePrices
+
+
+@dataclass
+class SubscriptionManager:
+    live_prices: LivePrices
+    # Half-width of the strike window kept around the reference price
+    window: int = 500
+    # Extra room before a strike outside the window is dropped, so edge strikes don't flap
+    hysteresis: int = 50
+    max_symbols: int = 400
+    batch_size: int = 20
+    # Least recently needed first
+    last_needed: OrderedDict[str, None] = field(default_factory=OrderedDict)
+    strikes: dict[str, Decimal] = field(default_factory=dict)
+    touched: set[str] = field(default_factory=set)
+
+    # Symbols required since this call are never evicted by the next rebalance
+    def begin_pass(self):
+        self.touched.clear()
+
+    async def require(self, options: list[Option]):
+        for option in options:
+            self.strikes[option.streamer_symbol] = option.strike_price
+            self.last_needed[option.streamer_symbol] = None
+            self.last_needed.move_to_end(option.streamer_symbol)
+            self.touched.add(option.streamer_symbol)
+        await self.live_prices.add_symbols([o.streamer_symbol for o in options])
+
+    def _evictable(self, reference_price: Decimal, pinned: set[str]) -> list[str]:
+        limit = self.window + self.hysteresis
+        distance = lambda s: abs(self.strikes[s] - reference_price)
+        candidates = [s for s in self.last_needed if s not in pinned and s not in self.touched]
+        outside = [s for s in candidates if distance(s) > limit]
+
+        excess = len(self.live_prices.streamer_symbols) - len(outside) - self.max_symbols
+        if excess <= 0:
+            # Wait until a whole batch has drifted out instead of unsubscribing one symbol per tick
+            return outside if len(outside) >= self.batch_size else []
+
+        # Still over budget, round up to a whole batch and drop the strikes in the hysteresis band furthest first,
+        # then the least recently needed ones inside the window
+        excess += -excess % self.batch_size
+        dropped = set(outside)
+        band = sorted((s for s in candidates if s not in dropped and distance(s) > self.window), key=distance, reverse=True)
+        band_set = set(band)
+        inside = [s for s in candidates if s not in dropped and s not in band_set]
+        return outside + (band + inside)[:excess]
+
+    async def release(self, streamer_symbols: list[str]):
+        await self._remove([s for s in streamer_symbols if s in self.last_needed])
+
+    async def rebalance(self, reference_price: Decimal, pinned: set[str]):
+        await self._remove(self._evictable(reference_price, pinned))
+
+    async def _remove(self, evictable: list[str]):
+        for i in range(0, len(evictable), self.batch_size):
+            batch = evictable[i:i + self.batch_size]
+            await self.live_prices.remove_symbols(batch)
+            # A concurrent release may have dropped some of them already
+            for symbol in batch:
+                self.last_needed.pop(symbol, None)
+                self.strikes.pop(symbol, None)
+                self.touched.discard(symbol)
+        if evictable:
+            print(f'Unsubscribed from {len(evictable)} symbols, {len(self.live_prices.streamer_symbols)} remaining')
@@ -0,0 +1,70 @@
+import re
+import sys
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+from itertools import product
+from typing import Iterable
+
+from tastytrade.instruments import OptionType
+
+# (root, expiry, option type, strike)
+OptionKey = tuple[str, date, OptionType, Decimal]
+
+# A few expiries' worth of strikes on both sides, bounded since parsers see arbitrary input
+_CACHE_SIZE = 8192
+
+_STREAMER_PATTERN = re.compile(r'^\.(.+)(\d{6})([CP])(\d+(?:\.\d+)?)$')
+
+
+def _strike_str(strike: Decimal) -> str:
+    # 5750 -> '5750', 12.50 -> '12.5' as DXLink expects
+    return format(Decimal(strike).normalize(), 'f')
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def occ_symbol(root: str, expiry: date, option_type: OptionType, strike: Decimal) -> str:
+    return sys.intern(f'{root.ljust(6)}{expiry:%y%m%d}{option_type.value}{int(Decimal(strike) * 1000):08d}')
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def streamer_symbol(root: str, expiry: date, option_type: OptionType, strike: Decimal) -> str:
+    return sys.intern(f'.{root}{expiry:%y%m%d}{option_type.value}{_strike_str(strike)}')
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def parse_occ_symbol(symbol: str) -> OptionKey:
+    root = symbol[:6].rstrip()
+    expiry = datetime.strptime(symbol[6:12], '%y%m%d').date()
+    return sys.intern(root), expiry, OptionType(symbol[12]), Decimal(int(symbol[13:21])) / 1000
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def parse_streamer_symbol(symbol: str) -> OptionKey:
+    match = _STREAMER_PATTERN.match(symbol)
+    if match is None:
+        raise ValueError(f'Not an option streamer symbol: {symbol}')
+    root, expiry, option_type, strike = match.groups()
+    return sys.intern(root), datetime.strptime(expiry, '%y%m%d').date(), OptionType(option_type), Decimal(strike)
+
+
+def occ_to_streamer_symbol(symbol: str) -> str:
+    return streamer_symbol(*parse_occ_symbol(symbol))
+
+
+# Generates every (OCC, streamer) symbol pair for a strike range and expiry set without touching the API
+def bulk_symbols(
+    root: str,
+    expiries: Iterable[date],
+    strikes: Iterable[Decimal],
+    option_types: Iterable[OptionType] = (OptionType.PUT, OptionType.CALL),
+) -> dict[OptionKey, tuple[str, str]]:
+    root = sys.intern(root)
+    strikes = [Decimal(s) for s in strikes]
+    return {
+        (root, expiry, option_type, strike): (
+            occ_symbol(root, expiry, option_type, strike),
+            streamer_symbol(root, expiry, option_type, strike),
+        )
+        for expiry, option_type, strike in product(expiries, option_types, strikes)
+    }